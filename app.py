@@ -5,16 +5,33 @@ Streamlit app with ScaleDown API integration
 
 import streamlit as st
 import pandas as pd
-import sys
-from pathlib import Path
+import numpy as np
+import hashlib
+import io
 
-# Add src to path
-sys.path.insert(0, str(Path(__file__).parent / 'src'))
+import matplotlib
+matplotlib.use("Agg")
+# Small, simplified PNGs: the heatmap image otherwise dominates the page payload
+matplotlib.rcParams.update({
+    'figure.dpi': 72,
+    'savefig.dpi': 72,
+    'path.simplify': True,
+    'path.simplify_threshold': 1.0,
+})
 
 from src.eda_agent import EDAAgent
-from src.schema_compressor import SchemaCompressor
 from src.scaledown_api import ScaleDownIntegration, save_api_key, load_api_key
-from src.visualizations import plot_missing_values, plot_correlation_matrix
+from src.utils import fast_read_csv, downcast_numeric, approx_memory_mb, correlation_matrix, load_sample_data
+
+# Stable content hash for uploaded files: xxh3 if available, else BLAKE2b
+try:
+    import xxhash
+
+    def content_hash(data: bytes) -> str:
+        return xxhash.xxh3_64_hexdigest(data)
+except ImportError:
+    def content_hash(data: bytes) -> str:
+        return hashlib.blake2b(data, digest_size=16).hexdigest()
 
 # Page configuration
 st.set_page_config(
@@ -24,6 +41,80 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+
+def session_figure(key: str, figsize: tuple):
+    """
+    Get this session's Figure stored under `key`, cleared for redrawing.
+    
+    Figures are created once per session (outside pyplot's global figure
+    registry, so nothing leaks across sessions) and reused on every rerun.
+    """
+    if key not in st.session_state:
+        from matplotlib.figure import Figure
+        st.session_state[key] = Figure(figsize=figsize)
+    fig = st.session_state[key]
+    fig.clear()
+    return fig
+
+
+def show_figure(fig):
+    """
+    Render a Figure at container width as a PNG at `savefig.dpi`.
+    
+    st.pyplot always saves at dpi=200 with bbox_inches='tight'; saving here
+    keeps the rcParams DPI and skips the extra tight-bbox layout pass.
+    """
+    buf = io.BytesIO()
+    fig.savefig(buf, format="png")
+    st.image(buf.getvalue(), width="stretch")
+
+
+@st.cache_resource
+def get_scaledown(api_key: str) -> ScaleDownIntegration:
+    """Share one ScaleDown client (and its HTTP connection pool) per API key."""
+    return ScaleDownIntegration(api_key)
+
+
+# Cached computations, keyed on a content hash of the loaded dataset so
+# reruns (widget clicks, tab switches) don't redo the pandas work.
+# Leading-underscore arguments are excluded from Streamlit's cache key.
+@st.cache_data(show_spinner=False)
+def _load_df(df_hash: str, _data: bytes) -> pd.DataFrame:
+    return downcast_numeric(fast_read_csv(io.BytesIO(_data)))
+
+
+@st.cache_data(show_spinner=False)
+def _memory_mb(df_hash: str, _df: pd.DataFrame) -> float:
+    return approx_memory_mb(_df)
+
+
+@st.cache_data(show_spinner=False)
+def _corr(df_hash: str, cols: tuple, _df: pd.DataFrame) -> pd.DataFrame:
+    return correlation_matrix(_df, list(cols), dtype=np.float32)
+
+
+def render_compression(label: str, original_text: str, result: dict, height: int = 200):
+    """Show a ScaleDown result with its token statistics."""
+    if "error" in result:
+        st.error(f"API Error: {result['error']}")
+        return
+    compressed_content = result.get("compressed", {}).get("content", "")
+    st.text_area(f"Ultra-Compressed {label}", compressed_content, height=height)
+    stats = get_scaledown(st.session_state.api_key).get_compression_stats(original_text, result)
+    st.metric("Reduction", f"{stats['reduction_ratio']:.1f}x",
+              help=f"{stats['original_tokens']:,} → {stats['compressed_tokens']:,} tokens")
+
+
+def set_dataset(df: pd.DataFrame, df_hash: str, name: str):
+    """Store a newly loaded dataset plus the per-column metadata the tabs reuse."""
+    st.session_state.df = df
+    st.session_state.df_hash = df_hash
+    st.session_state.agent = EDAAgent(df, name=name)
+    st.session_state.results = None
+    st.session_state.numeric_cols = df.select_dtypes(include='number').columns.tolist()
+    st.session_state.na_counts = np.count_nonzero(df.isna().to_numpy(), axis=0)
+
+
 # Custom CSS
 st.markdown("""
     <style>
@@ -57,6 +148,12 @@ if 'agent' not in st.session_state:
     st.session_state.agent = None
 if 'results' not in st.session_state:
     st.session_state.results = None
+if 'df_hash' not in st.session_state:
+    st.session_state.df_hash = None
+if 'numeric_cols' not in st.session_state:
+    st.session_state.numeric_cols = []
+if 'na_counts' not in st.session_state:
+    st.session_state.na_counts = None
 
 # Header
 st.markdown('<div class="main-header">🧠 Data Analysis Agent</div>', unsafe_allow_html=True)
@@ -128,9 +225,12 @@ with tab1:
         
         if uploaded_file is not None:
             try:
-                df = pd.read_csv(uploaded_file)
-                st.session_state.df = df
-                st.session_state.agent = EDAAgent(df, name="Web Analysis")
+                data = uploaded_file.getvalue()
+                df_hash = content_hash(data)
+                # Only rebuild the agent when a different file is uploaded
+                if st.session_state.df_hash != df_hash:
+                    set_dataset(_load_df(df_hash, data), df_hash, "Web Analysis")
+                df = st.session_state.df
                 
                 st.success(f"✅ Dataset loaded: {df.shape[0]} rows × {df.shape[1]} columns")
                 
@@ -146,7 +246,7 @@ with tab1:
                 with col_b:
                     st.metric("Columns", df.shape[1])
                 with col_c:
-                    st.metric("Memory", f"{df.memory_usage(deep=True).sum() / 1024**2:.2f} MB")
+                    st.metric("Memory", f"{_memory_mb(st.session_state.df_hash, df):.2f} MB")
                 
             except Exception as e:
                 st.error(f"Error loading file: {e}")
@@ -154,24 +254,15 @@ with tab1:
     with col2:
         st.subheader("Sample Datasets")
         if st.button("🌸 Load Iris"):
-            from src.utils import load_sample_data
-            df = load_sample_data('iris')
-            st.session_state.df = df
-            st.session_state.agent = EDAAgent(df, name="Iris Analysis")
+            set_dataset(load_sample_data('iris'), "sample:iris", "Iris Analysis")
             st.rerun()
         
         if st.button("🚢 Load Titanic"):
-            from src.utils import load_sample_data
-            df = load_sample_data('titanic')
-            st.session_state.df = df
-            st.session_state.agent = EDAAgent(df, name="Titanic Analysis")
+            set_dataset(load_sample_data('titanic'), "sample:titanic", "Titanic Analysis")
             st.rerun()
         
         if st.button("💵 Load Tips"):
-            from src.utils import load_sample_data
-            df = load_sample_data('tips')
-            st.session_state.df = df
-            st.session_state.agent = EDAAgent(df, name="Tips Analysis")
+            set_dataset(load_sample_data('tips'), "sample:tips", "Tips Analysis")
             st.rerun()
 
 # Tab 2: Analysis
@@ -192,12 +283,11 @@ with tab2:
             
             # Show compressed schema
             st.subheader("📋 Compressed Schema")
-            schema_text = st.session_state.agent.get_schema_context()
+            schema_text = st.session_state.agent.schema_context
             st.text_area("Schema", schema_text, height=200)
             
             # Token efficiency
-            compressor = SchemaCompressor()
-            stats = compressor.estimate_token_reduction(st.session_state.df)
+            stats = st.session_state.agent.get_token_stats()
             
             col1, col2, col3, col4 = st.columns(4)
             with col1:
@@ -248,14 +338,15 @@ with tab3:
         # Missing values plot
         st.subheader("Missing Values")
         try:
-            fig, ax = plt.subplots(figsize=(10, 4))
-            missing_data = df.isnull().sum()
+            fig = session_figure("fig_missing", (10, 4))
+            ax = fig.add_subplot()
+            missing_data = pd.Series(st.session_state.na_counts, index=df.columns)
             missing_data = missing_data[missing_data > 0]
             if len(missing_data) > 0:
                 missing_data.plot(kind='bar', ax=ax, color='coral')
                 ax.set_title('Missing Values by Column')
                 ax.set_ylabel('Count')
-                st.pyplot(fig)
+                show_figure(fig)
             else:
                 st.success("✅ No missing values!")
         except Exception as e:
@@ -263,15 +354,24 @@ with tab3:
         
         # Correlation matrix
         st.subheader("Correlation Matrix")
-        numeric_cols = df.select_dtypes(include=['number']).columns.tolist()
+        numeric_cols = st.session_state.numeric_cols
         if len(numeric_cols) >= 2:
             try:
-                import matplotlib.pyplot as plt
-                import seaborn as sns
-                fig, ax = plt.subplots(figsize=(10, 8))
-                corr = df[numeric_cols].corr()
-                sns.heatmap(corr, annot=True, cmap='coolwarm', center=0, ax=ax, fmt='.2f')
-                st.pyplot(fig)
+                fig = session_figure("fig_corr", (10, 8))
+                ax = fig.add_subplot()
+                corr = _corr(st.session_state.df_hash, tuple(numeric_cols), df)
+                im = ax.imshow(corr.values, cmap='coolwarm', vmin=-1, vmax=1)
+                fig.colorbar(im, ax=ax)
+                ax.set_xticks(range(len(numeric_cols)))
+                ax.set_xticklabels(numeric_cols, rotation=45, ha='right')
+                ax.set_yticks(range(len(numeric_cols)))
+                ax.set_yticklabels(numeric_cols)
+                # Per-cell text artists get expensive on wide frames
+                if len(numeric_cols) <= 15:
+                    for i in range(len(numeric_cols)):
+                        for j in range(len(numeric_cols)):
+                            ax.text(j, i, f"{corr.values[i, j]:.2f}", ha='center', va='center', fontsize=8)
+                show_figure(fig)
             except Exception as e:
                 st.error(f"Error creating correlation matrix: {e}")
         else:
@@ -288,7 +388,33 @@ with tab4:
         st.write("Apply additional compression to your analysis for maximum token efficiency!")
         
         # Initialize API
-        scaledown = ScaleDownIntegration(st.session_state.api_key)
+        scaledown = get_scaledown(st.session_state.api_key)
+        
+        # Compress everything at once; the three API calls run in parallel
+        st.subheader("Compress Everything")
+        if st.button("⚡ Compress All", type="primary"):
+            with st.spinner("Compressing schema, history and report..."):
+                agent = st.session_state.agent
+                texts = {
+                    "schema": agent.schema_context,
+                    "history": agent.get_history_context(),
+                    "report": agent.generate_summary_report(),
+                }
+                results = scaledown.compress_bundle(
+                    texts["schema"],
+                    texts["history"],
+                    texts["report"],
+                    model=compression_model,
+                    rate=compression_rate
+                )
+            
+            c1, c2, c3 = st.columns(3)
+            for column, (name, label) in zip((c1, c2, c3), [("schema", "Schema"), ("history", "History"), ("report", "Report")]):
+                with column:
+                    st.markdown(f"**{label}**")
+                    render_compression(label, texts[name], results[name])
+        
+        st.divider()
         
         col1, col2 = st.columns(2)
         
@@ -296,7 +422,7 @@ with tab4:
             st.subheader("Compress Schema")
             if st.button("🗜️ Compress Schema with ScaleDown"):
                 with st.spinner("Compressing..."):
-                    schema_text = st.session_state.agent.get_schema_context()
+                    schema_text = st.session_state.agent.schema_context
                     result = scaledown.compress_schema(
                         schema_text,
                         model=compression_model,
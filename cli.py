@@ -4,23 +4,45 @@ Command-line interface for the Data Analysis Agent.
 
 import argparse
 import sys
-import pandas as pd
 from pathlib import Path
 
-# Add src to path
-sys.path.insert(0, str(Path(__file__).parent / 'src'))
+# pandas and the agent modules are imported inside the command handlers so
+# that `--help` and argument errors don't pay for the heavy imports.
 
-from src.eda_agent import EDAAgent
-from src.schema_compressor import SchemaCompressor
-from src.utils import load_sample_data
+# Lines of the report echoed to stdout when it is also written to a file
+PREVIEW_LINES = 40
 
 
-def analyze_file(filepath, output=None, auto=False):
+def emit_report(report, output=None, quiet=False):
+    """Write the report to `output` (if given) and echo it to stdout.
+
+    When the report goes to a file only the first PREVIEW_LINES lines are
+    printed; `quiet` suppresses the echo entirely.
+    """
+    if not quiet:
+        if output:
+            lines = report.splitlines()
+            print("\n" + "\n".join(lines[:PREVIEW_LINES]))
+            if len(lines) > PREVIEW_LINES:
+                print(f"... ({len(lines) - PREVIEW_LINES} more lines in {output})")
+        else:
+            print("\n" + report)
+    
+    if output:
+        print(f"\nSaving report to {output}...")
+        Path(output).write_text(report, encoding="utf-8")
+        print("✓ Report saved")
+
+
+def analyze_file(filepath, output=None, auto=False, quiet=False):
     """Analyze a CSV file."""
+    from src.eda_agent import EDAAgent
+    from src.utils import fast_read_csv, downcast_numeric
+    
     print(f"Loading data from {filepath}...")
     
     try:
-        df = pd.read_csv(filepath)
+        df = downcast_numeric(fast_read_csv(filepath))
         print(f"✓ Loaded {df.shape[0]} rows × {df.shape[1]} columns")
     except Exception as e:
         print(f"✗ Error loading file: {e}")
@@ -43,19 +65,16 @@ def analyze_file(filepath, output=None, auto=False):
         agent.detect_outliers()
         report = agent.generate_summary_report()
     
-    print("\n" + report)
-    
-    if output:
-        print(f"\nSaving report to {output}...")
-        with open(output, 'w') as f:
-            f.write(report)
-        print("✓ Report saved")
+    emit_report(report, output, quiet)
     
     return 0
 
 
-def analyze_sample(dataset_name, output=None):
+def analyze_sample(dataset_name, output=None, quiet=False):
     """Analyze a sample dataset."""
+    from src.eda_agent import EDAAgent
+    from src.utils import load_sample_data
+    
     print(f"Loading sample dataset: {dataset_name}...")
     
     try:
@@ -70,23 +89,20 @@ def analyze_sample(dataset_name, output=None):
     results = agent.run_automated_eda()
     report = results['summary_report']
     
-    print("\n" + report)
-    
-    if output:
-        print(f"\nSaving report to {output}...")
-        with open(output, 'w') as f:
-            f.write(report)
-        print("✓ Report saved")
+    emit_report(report, output, quiet)
     
     return 0
 
 
 def compress_schema(filepath, output=None):
     """Compress schema of a CSV file."""
+    from src.schema_compressor import SchemaCompressor
+    from src.utils import fast_read_csv, downcast_numeric
+    
     print(f"Loading data from {filepath}...")
     
     try:
-        df = pd.read_csv(filepath)
+        df = downcast_numeric(fast_read_csv(filepath))
         print(f"✓ Loaded {df.shape[0]} rows × {df.shape[1]} columns")
     except Exception as e:
         print(f"✗ Error loading file: {e}")
@@ -102,7 +118,7 @@ def compress_schema(filepath, output=None):
     print("=" * 60)
     
     # Show token efficiency
-    stats = compressor.estimate_token_reduction(df)
+    stats = compressor.estimate_token_reduction(df, schema=schema)
     print(f"\n💰 Token Efficiency:")
     print(f"  Schema tokens: {stats['schema_tokens']:,}")
     print(f"  Estimated full tokens: {stats['estimated_full_tokens']:,}")
@@ -111,8 +127,7 @@ def compress_schema(filepath, output=None):
     
     if output:
         print(f"\nSaving schema to {output}...")
-        with open(output, 'w') as f:
-            f.write(schema_text)
+        Path(output).write_text(schema_text, encoding="utf-8")
         print("✓ Schema saved")
     
     return 0
@@ -131,6 +146,9 @@ Examples:
   # Automated analysis with output
   python cli.py analyze data.csv --auto --output report.txt
 
+  # Save the report without echoing it
+  python cli.py analyze data.csv --auto --output report.txt --quiet
+
   # Analyze sample dataset
   python cli.py sample titanic
 
@@ -147,6 +165,8 @@ Examples:
     analyze_parser.add_argument('--output', '-o', help='Output file for report')
     analyze_parser.add_argument('--auto', '-a', action='store_true', 
                                help='Run automated EDA')
+    analyze_parser.add_argument('--quiet', '-q', action='store_true',
+                               help='Do not echo the report to stdout')
     
     # Sample command
     sample_parser = subparsers.add_parser('sample', help='Analyze sample dataset')
@@ -154,6 +174,8 @@ Examples:
                               choices=['iris', 'titanic', 'tips', 'random'],
                               help='Sample dataset name')
     sample_parser.add_argument('--output', '-o', help='Output file for report')
+    sample_parser.add_argument('--quiet', '-q', action='store_true',
+                              help='Do not echo the report to stdout')
     
     # Schema command
     schema_parser = subparsers.add_parser('schema', help='Compress schema only')
@@ -168,9 +190,9 @@ Examples:
     
     try:
         if args.command == 'analyze':
-            return analyze_file(args.file, args.output, args.auto)
+            return analyze_file(args.file, args.output, args.auto, args.quiet)
         elif args.command == 'sample':
-            return analyze_sample(args.dataset, args.output)
+            return analyze_sample(args.dataset, args.output, args.quiet)
         elif args.command == 'schema':
             return compress_schema(args.file, args.output)
     except KeyboardInterrupt:
@@ -49,6 +49,11 @@ if errorlevel 1 (
 echo.
 echo ✓ Dependencies installed successfully
 
+REM Warm the sample dataset cache (%USERPROFILE%\.cache\data-analysis-agent)
+echo.
+echo 🗄️  Caching sample datasets...
+python -c "from src.utils import load_sample_data; [load_sample_data(n) for n in ('iris', 'titanic', 'tips', 'random')]"
+
 REM Run tests
 echo.
 echo 🧪 Running module tests...
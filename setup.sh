@@ -51,6 +51,11 @@ else
     exit 1
 fi
 
+# Warm the sample dataset cache (~/.cache/data-analysis-agent)
+echo ""
+echo "🗄️  Caching sample datasets..."
+python -c "from src.utils import load_sample_data; [load_sample_data(n) for n in ('iris', 'titanic', 'tips', 'random')]"
+
 # Run tests
 echo ""
 echo "🧪 Running module tests..."
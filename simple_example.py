@@ -9,7 +9,6 @@ Usage:
 """
 
 import sys
-sys.path.insert(0, 'src')
 
 print("=" * 70)
 print("🧠 DATA ANALYSIS AGENT - Simple Example")
@@ -43,7 +42,7 @@ print(compressor.to_text(schema))
 print()
 
 # Show token savings
-stats = compressor.estimate_token_reduction(df)
+stats = compressor.estimate_token_reduction(df, schema=schema)
 print(f"💰 Token Efficiency:")
 print(f"  • Schema tokens: {stats['schema_tokens']:,}")
 print(f"  • Full dataset tokens (estimated): {stats['estimated_full_tokens']:,}")
@@ -60,26 +59,22 @@ print("✓ Agent initialized\n")
 print("💡 Step 5: Getting analysis suggestions...")
 suggestions = agent.suggest_next_steps()
 print("Agent suggests:")
-for i, suggestion in enumerate(suggestions[:3], 1):
-    print(f"  {i}. {suggestion}")
+sys.stdout.write("".join(f"  {i}. {suggestion}\n" for i, suggestion in enumerate(suggestions[:3], 1)))
 print()
 
 # Step 6: Run quick analyses
 print("🔍 Step 6: Running analyses...")
 print("\n[Missing Value Analysis]")
 missing_results = agent.analyze_missing_values()
-for insight in missing_results['insights']:
-    print(f"  • {insight}")
+sys.stdout.write("".join(f"  • {insight}\n" for insight in missing_results['insights']))
 
 print("\n[Distribution Analysis]")
 dist_results = agent.analyze_distributions()
-for insight in dist_results['insights'][:3]:
-    print(f"  • {insight}")
+sys.stdout.write("".join(f"  • {insight}\n" for insight in dist_results['insights'][:3]))
 
 print("\n[Correlation Analysis]")
 corr_results = agent.analyze_correlations(threshold=0.5)
-for insight in corr_results['insights'][:3]:
-    print(f"  • {insight}")
+sys.stdout.write("".join(f"  • {insight}\n" for insight in corr_results['insights'][:3]))
 
 # Step 7: Show history compression
 print("\n📝 Step 7: Viewing compressed history...")
@@ -5,13 +5,15 @@ Intelligent agent for automated exploratory data analysis using compressed schem
 
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
 from typing import Dict, Any, List, Optional, Tuple
 import warnings
+from functools import cached_property
 
 from .schema_compressor import SchemaCompressor
 from .history_compressor import HistoryCompressor, AnalysisStep
+from .kernels import (
+    column_stats, column_moments, correlation, iqr_outlier_counts, zscore_outlier_counts
+)
 
 warnings.filterwarnings('ignore')
 
@@ -41,13 +43,104 @@ class EDAAgent:
         
         # Generate compressed schema
         self.compressed_schema = self.schema_compressor.compress(df)
+        self._token_stats: Optional[Dict[str, int]] = None
         
         # Initialize analysis state
         self.current_step = 0
         
+        # Numeric columns (per the schema) and correlation matrices by column set
+        self._numeric_cols: Tuple[str, ...] = tuple(
+            col for col, info in self.compressed_schema["columns"].items()
+            if info["type"] == "numeric"
+        )
+        self._corr_cache: Dict[Tuple[str, ...], pd.DataFrame] = {}
+        self._suggestion_flags = self._precompute_suggestion_flags()
+        
+        # Numeric columns materialized as one float64 block, built on demand
+        self._block_columns: Optional[Tuple[str, ...]] = None
+        self._block: Optional[np.ndarray] = None
+        
+    def _precompute_suggestion_flags(self) -> List[Tuple[str, Dict[str, Any]]]:
+        """
+        Derive per-column suggestion triggers from the (fixed) compressed schema.
+        
+        Only columns with at least one trigger are kept, so `suggest_next_steps`
+        scans just the interesting columns.
+        """
+        flagged = []
+        for col_name, col_info in self.compressed_schema["columns"].items():
+            flags = {
+                "missing": col_info["missing_ratio"] > 0.1,
+                "missing_ratio": col_info["missing_ratio"],
+                "outlier_prone": False,
+                "skewed": False,
+                "high_cardinality": False,
+                "unique_count": col_info.get("unique_count"),
+            }
+            
+            # Numeric: simple IQR-based outlier heuristic and mean/median skew check
+            if col_info["type"] == "numeric" and col_info["stats"]:
+                stats = col_info["stats"]
+                iqr = stats["q75"] - stats["q25"]
+                if iqr > 0:
+                    lower_bound = stats["q25"] - 1.5 * iqr
+                    upper_bound = stats["q75"] + 1.5 * iqr
+                    flags["outlier_prone"] = bool(
+                        stats["min"] < lower_bound or stats["max"] > upper_bound
+                    )
+                flags["skewed"] = bool(
+                    stats["mean"] > stats["median"] * 1.5 or stats["mean"] < stats["median"] * 0.67
+                )
+            
+            if col_info["type"] == "categorical":
+                flags["high_cardinality"] = col_info["cardinality"] == "high"
+            
+            if flags["missing"] or flags["outlier_prone"] or flags["skewed"] or flags["high_cardinality"]:
+                flagged.append((col_name, flags))
+        return flagged
+    
+    def _numeric_block(self, columns: List[str]) -> np.ndarray:
+        """
+        Get numeric columns as a contiguous float64 array (rows × columns).
+        
+        The block for the most recently requested column set is kept, so
+        consecutive analyses share a single DataFrame-to-NumPy conversion.
+        """
+        key = tuple(columns)
+        if self._block_columns != key:
+            self._block = np.ascontiguousarray(
+                self.df[list(columns)].to_numpy(dtype=np.float64, na_value=np.nan)
+            )
+            self._block_columns = key
+        return self._block
+    
+    def _corr(self, columns: Tuple[str, ...]) -> pd.DataFrame:
+        """Get the correlation matrix of `columns`, computed once per column set."""
+        if columns not in self._corr_cache:
+            # BLAS products on the shared block rather than pandas' per-pair loop
+            self._corr_cache[columns] = pd.DataFrame(
+                correlation(self._numeric_block(columns)),
+                index=list(columns),
+                columns=list(columns)
+            )
+        return self._corr_cache[columns]
+        
+    @cached_property
+    def schema_context(self) -> str:
+        """Compressed schema as text, serialized once and reused by every prompt."""
+        return self.schema_compressor.to_text(self.compressed_schema)
+    
     def get_schema_context(self) -> str:
         """Get compressed schema as text context."""
-        return self.schema_compressor.to_text(self.compressed_schema)
+        return self.schema_context
+    
+    def get_token_stats(self) -> Dict[str, int]:
+        """Get schema token-reduction estimates (computed once per agent)."""
+        if self._token_stats is None:
+            self._token_stats = self.schema_compressor.estimate_token_reduction(
+                self.df, schema=self.compressed_schema
+            )
+        return self._token_stats
     
     def get_history_context(self) -> str:
         """Get compressed history as text context."""
@@ -57,7 +150,7 @@ class EDAAgent:
         """Get combined context for LLM prompting."""
         context = [
             f"=== {self.name} Context ===\n",
-            self.get_schema_context(),
+            self.schema_context,
             "\n\n",
             self.history_compressor.to_text()
         ]
@@ -81,47 +174,23 @@ class EDAAgent:
             ])
             return suggestions
         
-        # Analyze schema for specific suggestions
-        for col_name, col_info in self.compressed_schema["columns"].items():
-            
-            # Missing value suggestions
-            if col_info["missing_ratio"] > 0.1:
+        # Schema-driven suggestions, from flags derived once in __init__
+        for col_name, flags in self._suggestion_flags:
+            if flags["missing"]:
                 suggestions.append(
-                    f"Investigate missing values in '{col_name}' ({col_info['missing_ratio']:.1%} missing)"
+                    f"Investigate missing values in '{col_name}' ({flags['missing_ratio']:.1%} missing)"
+                )
+            if flags["outlier_prone"]:
+                suggestions.append(f"Analyze potential outliers in '{col_name}'")
+            if flags["skewed"]:
+                suggestions.append(f"Examine distribution skewness in '{col_name}'")
+            if flags["high_cardinality"]:
+                suggestions.append(
+                    f"Analyze high cardinality in '{col_name}' ({flags['unique_count']} unique values)"
                 )
-            
-            # Numeric analysis suggestions
-            if col_info["type"] == "numeric" and col_info["stats"]:
-                stats = col_info["stats"]
-                # Check for outliers (simple IQR-based heuristic)
-                iqr = stats["q75"] - stats["q25"]
-                if iqr > 0:
-                    lower_bound = stats["q25"] - 1.5 * iqr
-                    upper_bound = stats["q75"] + 1.5 * iqr
-                    if stats["min"] < lower_bound or stats["max"] > upper_bound:
-                        suggestions.append(
-                            f"Analyze potential outliers in '{col_name}'"
-                        )
-                
-                # Check for skewness
-                if stats["mean"] > stats["median"] * 1.5 or stats["mean"] < stats["median"] * 0.67:
-                    suggestions.append(
-                        f"Examine distribution skewness in '{col_name}'"
-                    )
-            
-            # Categorical analysis suggestions
-            if col_info["type"] == "categorical":
-                if col_info["cardinality"] == "high":
-                    suggestions.append(
-                        f"Analyze high cardinality in '{col_name}' ({col_info['unique_count']} unique values)"
-                    )
         
         # Relationship analysis
-        numeric_cols = [
-            col for col, info in self.compressed_schema["columns"].items()
-            if info["type"] == "numeric"
-        ]
-        if len(numeric_cols) >= 2:
+        if len(self._numeric_cols) >= 2:
             suggestions.append("Explore correlations between numeric features")
         
         # Limit suggestions
@@ -134,25 +203,23 @@ class EDAAgent:
         Returns:
             Dictionary with missing value analysis results
         """
-        missing_summary = {}
-        missing_cols = []
-        
-        for col in self.df.columns:
-            missing_count = self.df[col].isna().sum()
-            if missing_count > 0:
-                missing_ratio = missing_count / len(self.df)
-                missing_cols.append(col)
-                missing_summary[col] = {
-                    "count": int(missing_count),
-                    "ratio": float(missing_ratio)
-                }
+        # One vectorized pass over the whole frame instead of a scan per column
+        n_rows = len(self.df)
+        counts = self.df.isna().sum(axis=0)
+        counts = counts[counts > 0]
+        
+        missing_cols = counts.index.tolist()
+        missing_summary = {
+            col: {"count": int(count), "ratio": float(count) / n_rows}
+            for col, count in counts.items()
+        }
         
         insights = []
         if missing_cols:
             insights.append(f"Found {len(missing_cols)} columns with missing values")
-            high_missing = [c for c, v in missing_summary.items() if v["ratio"] > 0.3]
+            high_missing = int((counts / n_rows > 0.3).sum())
             if high_missing:
-                insights.append(f"{len(high_missing)} columns have >30% missing data")
+                insights.append(f"{high_missing} columns have >30% missing data")
         else:
             insights.append("No missing values detected in dataset")
         
@@ -182,38 +249,32 @@ class EDAAgent:
             Dictionary with distribution analysis
         """
         if columns is None:
-            columns = [
-                col for col, info in self.compressed_schema["columns"].items()
-                if info["type"] == "numeric"
-            ]
+            columns = list(self._numeric_cols)
         
         distributions = {}
         insights = []
         
-        for col in columns:
-            if col not in self.df.columns:
-                continue
-                
-            series = self.df[col].dropna()
-            if len(series) == 0:
-                continue
-            
-            # Calculate distribution metrics
-            skewness = series.skew()
-            kurtosis = series.kurtosis()
-            
-            dist_type = "normal"
-            if abs(skewness) > 1:
-                dist_type = "right-skewed" if skewness > 0 else "left-skewed"
-            
+        # Frame-level skew/kurt over the shared float64 block (Arrow-backed
+        # columns from fast_read_csv don't implement kurtosis themselves)
+        present = [col for col in columns if col in self.df.columns]
+        block = pd.DataFrame(self._numeric_block(present), columns=present, copy=False)
+        block = block.loc[:, block.notna().any()]
+        skewness = block.skew()
+        kurtosis = block.kurt()
+        dist_types = np.where(
+            ~(skewness.abs() > 1), "normal",
+            np.where(skewness > 0, "right-skewed", "left-skewed")
+        )
+        
+        for col, skew, kurt, dist_type in zip(block.columns, skewness, kurtosis, dist_types):
             distributions[col] = {
-                "skewness": float(skewness),
-                "kurtosis": float(kurtosis),
-                "distribution_type": dist_type
+                "skewness": float(skew),
+                "kurtosis": float(kurt),
+                "distribution_type": str(dist_type)
             }
             
-            if abs(skewness) > 1:
-                insights.append(f"'{col}' is {dist_type} (skew={skewness:.2f})")
+            if abs(skew) > 1:
+                insights.append(f"'{col}' is {dist_type} (skew={skew:.2f})")
         
         # Record in history
         self.history_compressor.add_step(
@@ -239,10 +300,7 @@ class EDAAgent:
         Returns:
             Dictionary with correlation analysis
         """
-        numeric_cols = [
-            col for col, info in self.compressed_schema["columns"].items()
-            if info["type"] == "numeric"
-        ]
+        numeric_cols = list(self._numeric_cols)
         
         if len(numeric_cols) < 2:
             return {
@@ -250,25 +308,28 @@ class EDAAgent:
                 "insights": ["Not enough numeric columns for correlation analysis"]
             }
         
-        corr_matrix = self.df[numeric_cols].corr()
+        corr_matrix = self._corr(self._numeric_cols)
         
         # Find strong correlations
         strong_correlations = []
         insights = []
         
-        for i in range(len(numeric_cols)):
-            for j in range(i + 1, len(numeric_cols)):
-                corr_value = corr_matrix.iloc[i, j]
-                if abs(corr_value) >= threshold:
-                    strong_correlations.append({
-                        "feature1": numeric_cols[i],
-                        "feature2": numeric_cols[j],
-                        "correlation": float(corr_value)
-                    })
-                    insights.append(
-                        f"Strong correlation ({corr_value:.2f}) between "
-                        f"'{numeric_cols[i]}' and '{numeric_cols[j]}'"
-                    )
+        # Select upper-triangle pairs at or above the threshold in one shot
+        values = corr_matrix.to_numpy()
+        rows, cols = np.triu_indices(len(numeric_cols), k=1)
+        pair_values = values[rows, cols]
+        strong = np.abs(pair_values) >= threshold
+        
+        for i, j, corr_value in zip(rows[strong], cols[strong], pair_values[strong]):
+            strong_correlations.append({
+                "feature1": numeric_cols[i],
+                "feature2": numeric_cols[j],
+                "correlation": float(corr_value)
+            })
+            insights.append(
+                f"Strong correlation ({corr_value:.2f}) between "
+                f"'{numeric_cols[i]}' and '{numeric_cols[j]}'"
+            )
         
         if not insights:
             insights.append(f"No strong correlations found (threshold={threshold})")
@@ -283,11 +344,26 @@ class EDAAgent:
         self.current_step += 1
         
         return {
-            "correlation_matrix": corr_matrix.to_dict(),
+            # Column labels plus row-major values rather than a k×k nested dict
+            "correlation_matrix": {
+                "columns": numeric_cols,
+                "values": values.tolist()
+            },
             "strong_correlations": strong_correlations,
             "insights": insights
         }
     
+    def correlation_matrix_as_nested_dict(self) -> Optional[Dict[str, Dict[str, float]]]:
+        """
+        Get the numeric correlation matrix as a nested {column: {column: value}} dict.
+        
+        Returns:
+            Nested dictionary, or None if there are fewer than 2 numeric columns
+        """
+        if len(self._numeric_cols) < 2:
+            return None
+        return self._corr(self._numeric_cols).to_dict()
+    
     def detect_outliers(self, columns: Optional[List[str]] = None, method: str = "iqr") -> Dict[str, Any]:
         """
         Detect outliers in numeric columns.
@@ -300,38 +376,30 @@ class EDAAgent:
             Dictionary with outlier analysis
         """
         if columns is None:
-            columns = [
-                col for col, info in self.compressed_schema["columns"].items()
-                if info["type"] == "numeric"
-            ]
+            columns = list(self._numeric_cols)
         
         outliers = {}
         insights = []
         
-        for col in columns:
-            if col not in self.df.columns:
-                continue
-                
-            series = self.df[col].dropna()
-            if len(series) == 0:
+        columns = [col for col in columns if col in self.df.columns]
+        block = self._numeric_block(columns)
+        
+        # One broadcasted mask over the block; only IQR needs the quantile sort
+        if method == "iqr":
+            stats = column_stats(block)
+            counts = iqr_outlier_counts(block, stats["q1"], stats["q3"])
+        else:  # zscore
+            stats = column_moments(block)
+            counts = zscore_outlier_counts(block, stats["mean"], stats["std"])
+        
+        for col, outlier_count, n_valid in zip(columns, counts, stats["count"]):
+            if n_valid == 0:
                 continue
             
-            if method == "iqr":
-                q1 = series.quantile(0.25)
-                q3 = series.quantile(0.75)
-                iqr = q3 - q1
-                lower_bound = q1 - 1.5 * iqr
-                upper_bound = q3 + 1.5 * iqr
-                outlier_mask = (series < lower_bound) | (series > upper_bound)
-            else:  # zscore
-                z_scores = np.abs((series - series.mean()) / series.std())
-                outlier_mask = z_scores > 3
-            
-            outlier_count = outlier_mask.sum()
             if outlier_count > 0:
                 outliers[col] = {
                     "count": int(outlier_count),
-                    "ratio": float(outlier_count / len(series))
+                    "ratio": float(outlier_count / n_valid)
                 }
                 insights.append(
                     f"'{col}' has {outlier_count} outliers ({outliers[col]['ratio']:.1%})"
@@ -362,37 +430,30 @@ class EDAAgent:
         Returns:
             Formatted report string
         """
+        suggestions = self.suggest_next_steps()
+        schema_stats = self.get_token_stats()
+        
         report_sections = [
             "=" * 60,
             f"{self.name} - Analysis Summary Report",
             "=" * 60,
             "",
-            self.get_schema_context(),
+            self.schema_context,
             "\n",
             self.history_compressor.to_text(),
             "\n",
             "=" * 60,
             "SUGGESTED NEXT STEPS:",
             "=" * 60,
-        ]
-        
-        suggestions = self.suggest_next_steps()
-        for i, suggestion in enumerate(suggestions, 1):
-            report_sections.append(f"{i}. {suggestion}")
-        
-        # Add token efficiency stats
-        report_sections.extend([
+            *(f"{i}. {suggestion}" for i, suggestion in enumerate(suggestions, 1)),
+            # Add token efficiency stats
             "\n",
             "=" * 60,
             "TOKEN EFFICIENCY METRICS:",
             "=" * 60,
-        ])
-        
-        schema_stats = self.schema_compressor.estimate_token_reduction(self.df)
-        report_sections.append(
             f"Schema Compression: {schema_stats['reduction_ratio']:.1f}x reduction "
-            f"({schema_stats['tokens_saved']:,} tokens saved)"
-        )
+            f"({schema_stats['tokens_saved']:,} tokens saved)",
+        ]
         
         if self.current_step > 0:
             history_stats = self.history_compressor.estimate_token_savings()
@@ -418,6 +479,9 @@ class EDAAgent:
         # Step 1: Missing values
         results["analyses"]["missing_values"] = self.analyze_missing_values()
         
+        # Steps 2-4 share one float64 block of the numeric columns
+        self._numeric_block(self._numeric_cols)
+        
         # Step 2: Distributions
         results["analyses"]["distributions"] = self.analyze_distributions()
         
@@ -3,14 +3,23 @@ Analysis History Compression Module
 Compresses previous analytical steps to reduce token overhead while retaining key insights.
 """
 
-from typing import List, Dict, Any, Optional
+from typing import Deque, List, Dict, Any, Optional, Tuple
+from collections import deque
 from datetime import datetime
-import json
+from itertools import chain
+
+from .utils import dumps_json
 
 
 class AnalysisStep:
     """Represents a single analysis step in the EDA process."""
     
+    # No per-instance __dict__: histories can hold many steps
+    __slots__ = (
+        "step_number", "action", "description", "insights", "code", "timestamp",
+        "_dict_cache"
+    )
+    
     def __init__(
         self,
         step_number: int,
@@ -37,17 +46,25 @@ class AnalysisStep:
         self.insights = insights
         self.code = code
         self.timestamp = timestamp or datetime.now()
+        self._dict_cache: Optional[Dict[str, Any]] = None
     
     def to_dict(self) -> Dict[str, Any]:
-        """Convert to dictionary representation."""
-        return {
-            "step_number": self.step_number,
-            "action": self.action,
-            "description": self.description,
-            "insights": self.insights,
-            "code": self.code,
-            "timestamp": self.timestamp.isoformat()
-        }
+        """
+        Convert to dictionary representation.
+        
+        Steps are not modified once recorded, so the dictionary is built once;
+        each call returns a shallow copy that the caller is free to modify.
+        """
+        if self._dict_cache is None:
+            self._dict_cache = {
+                "step_number": self.step_number,
+                "action": self.action,
+                "description": self.description,
+                "insights": self.insights,
+                "code": self.code,
+                "timestamp": self.timestamp.isoformat()
+            }
+        return dict(self._dict_cache)
 
 
 class HistoryCompressor:
@@ -67,8 +84,17 @@ class HistoryCompressor:
             max_steps_to_keep: Maximum number of detailed steps to keep in memory
         """
         self.max_steps_to_keep = max_steps_to_keep
-        self.history: List[AnalysisStep] = []
+        self.history: Deque[AnalysisStep] = deque()
         self.archived_summary: List[str] = []
+        self._key_insights_cache: Optional[List[str]] = None
+        self._archived_text_cache: Optional[str] = None
+        
+        # Rolling buffers behind get_context_for_next_step: the last 3 step
+        # summaries and last 3 insights, tagged with the sequence number of
+        # the step they came from so entries from archived steps can be skipped
+        self._steps_added = 0
+        self._recent_texts: Deque[Tuple[int, str]] = deque(maxlen=3)
+        self._recent_insights: Deque[Tuple[int, str]] = deque(maxlen=3)
     
     def add_step(
         self,
@@ -92,6 +118,15 @@ class HistoryCompressor:
         step_number = len(self.history) + 1
         step = AnalysisStep(step_number, action, description, insights, code)
         self.history.append(step)
+        self._key_insights_cache = None
+        
+        seq = self._steps_added
+        self._steps_added += 1
+        step_text = f"{action}: {description}"
+        if insights:
+            step_text += f" (Found: {insights[0]})"  # First insight only
+        self._recent_texts.append((seq, step_text))
+        self._recent_insights.extend((seq, insight) for insight in insights)
         
         # If history exceeds limit, compress older steps
         if len(self.history) > self.max_steps_to_keep:
@@ -102,7 +137,8 @@ class HistoryCompressor:
     def _archive_old_steps(self):
         """Move older steps to archived summary."""
         # Take the oldest step
-        old_step = self.history.pop(0)
+        old_step = self.history.popleft()
+        self._key_insights_cache = None
         
         # Create a summary entry
         summary = f"Step {old_step.step_number} ({old_step.action}): "
@@ -111,6 +147,7 @@ class HistoryCompressor:
             summary += f"Insights: {'; '.join(old_step.insights)}"
         
         self.archived_summary.append(summary)
+        self._archived_text_cache = None
     
     def get_compressed_history(self) -> Dict[str, Any]:
         """
@@ -128,11 +165,12 @@ class HistoryCompressor:
         }
     
     def _extract_key_insights(self) -> List[str]:
-        """Extract all key insights from history."""
-        insights = []
-        for step in self.history:
-            insights.extend(step.insights)
-        return insights
+        """Extract all key insights from history (cached until the history changes)."""
+        if self._key_insights_cache is None:
+            self._key_insights_cache = list(
+                chain.from_iterable(step.insights for step in self.history)
+            )
+        return self._key_insights_cache
     
     def to_text(self) -> str:
         """
@@ -145,8 +183,7 @@ class HistoryCompressor:
         
         if self.archived_summary:
             lines.append("📦 ARCHIVED STEPS:")
-            for summary in self.archived_summary:
-                lines.append(f"  • {summary}")
+            lines.append(self._archived_text())
             lines.append("")
         
         if self.history:
@@ -168,6 +205,14 @@ class HistoryCompressor:
         
         return "\n".join(lines)
     
+    def _archived_text(self) -> str:
+        """Bulleted archived-step block for `to_text` (rebuilt only after archiving)."""
+        if self._archived_text_cache is None:
+            self._archived_text_cache = "\n".join(
+                f"  • {summary}" for summary in self.archived_summary
+            )
+        return self._archived_text_cache
+    
     def get_context_for_next_step(self) -> str:
         """
         Generate context string for the next analysis step.
@@ -185,21 +230,19 @@ class HistoryCompressor:
                 " → ".join(self.archived_summary[-3:])  # Last 3 archived
             )
         
-        # Add recent steps with more detail
+        # Buffered entries from steps that have since been archived are dropped
+        first_kept = self._steps_added - len(self.history)
+        
+        # Add recent steps with more detail (last 3 detailed steps)
         if self.history:
-            recent = []
-            for step in self.history[-3:]:  # Last 3 detailed steps
-                step_text = f"{step.action}: {step.description}"
-                if step.insights:
-                    step_text += f" (Found: {step.insights[0]})"  # First insight only
-                recent.append(step_text)
+            recent = [text for seq, text in self._recent_texts if seq >= first_kept]
             context_parts.append("Recent: " + " → ".join(recent))
         
-        # Add key insights
-        key_insights = self._extract_key_insights()
+        # Add key insights (last 3 insights)
+        key_insights = [text for seq, text in self._recent_insights if seq >= first_kept]
         if key_insights:
             context_parts.append(
-                f"Key findings: {'; '.join(key_insights[-3:])}"  # Last 3 insights
+                f"Key findings: {'; '.join(key_insights)}"
             )
         
         return " | ".join(context_parts)
@@ -208,6 +251,10 @@ class HistoryCompressor:
         """Clear all history (useful for starting fresh analysis)."""
         self.history.clear()
         self.archived_summary.clear()
+        self._key_insights_cache = None
+        self._archived_text_cache = None
+        self._recent_texts.clear()
+        self._recent_insights.clear()
     
     def export_full_history(self) -> str:
         """Export complete history as JSON."""
@@ -216,7 +263,7 @@ class HistoryCompressor:
             "recent_steps": [step.to_dict() for step in self.history],
             "export_timestamp": datetime.now().isoformat()
         }
-        return json.dumps(export_data, indent=2)
+        return dumps_json(export_data, indent=True).decode("utf-8")
     
     def estimate_token_savings(self) -> Dict[str, int]:
         """
@@ -225,17 +272,20 @@ class HistoryCompressor:
         Returns:
             Dictionary with token estimates
         """
-        # Full history tokens (if we kept everything)
-        full_history_text = ""
+        # Full history tokens (if we kept everything). Only the length of the
+        # "Step/Description/Insights/Code" text matters, so count its
+        # characters per step rather than building the string.
+        full_chars = 0
         for step in self.history:
-            full_history_text += f"Step {step.step_number}: {step.action}\n"
-            full_history_text += f"Description: {step.description}\n"
-            full_history_text += f"Insights: {', '.join(step.insights)}\n"
+            full_chars += len(f"Step {step.step_number}: {step.action}\n")
+            full_chars += len("Description: \n") + len(step.description)
+            full_chars += len("Insights: \n") + sum(len(i) for i in step.insights)
+            full_chars += len(", ") * max(len(step.insights) - 1, 0)
             if step.code:
-                full_history_text += f"Code:\n{step.code}\n"
-            full_history_text += "\n"
+                full_chars += len("Code:\n\n") + len(step.code)
+            full_chars += 1
         
-        full_tokens = len(full_history_text) // 4  # Rough estimate
+        full_tokens = full_chars // 4  # Rough estimate
         
         # Compressed context tokens
         compressed_text = self.get_context_for_next_step()
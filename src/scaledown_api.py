@@ -3,10 +3,26 @@ ScaleDown API Integration
 Integrates the Data Analysis Agent with ScaleDown API for maximum compression.
 """
 
-import requests
+import gzip
+import hashlib
 import json
+import threading
+from collections import OrderedDict
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any, Optional
 
+from .utils import dumps_json
+
+# Successful compression results kept per client (least recently used evicted)
+RESULT_CACHE_SIZE = 128
+
+# Request bodies smaller than this aren't worth gzipping
+GZIP_MIN_BYTES = 1024
+
 
 class ScaleDownIntegration:
     """
@@ -16,60 +32,130 @@ class ScaleDownIntegration:
     built-in schema and history compression.
     """
     
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, gzip_requests: bool = False):
         """
         Initialize ScaleDown integration.
         
         Args:
             api_key: ScaleDown API key
+            gzip_requests: Send large request bodies gzip-compressed
+                (Content-Encoding: gzip); the endpoint must accept it
         """
         self.api_key = api_key
+        self.gzip_requests = gzip_requests
         self.base_url = "https://api.scaledown.xyz/compress/raw/"
         self.headers = {
             'x-api-key': api_key,
             'Content-Type': 'application/json'
         }
+        # Reuse one connection pool so repeated calls skip the TCP/TLS handshake,
+        # retrying transient failures (compression requests are idempotent)
+        self._session = requests.Session()
+        self._session.headers.update(self.headers)
+        retry = Retry(
+            total=3,
+            backoff_factor=0.3,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=frozenset({"POST"}),
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=retry)
+        self._session.mount("https://", adapter)
+        
+        # Identical requests are answered from memory instead of the network
+        self._cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._cache_lock = threading.Lock()
     
-    def compress_schema(
+    def _compress(
         self,
-        schema_text: str,
+        prompt: str,
+        context: str,
         model: str = "gpt-4o",
         rate: str = "auto"
     ) -> Dict[str, Any]:
         """
-        Compress schema text using ScaleDown API.
+        Send one compression request to the ScaleDown API.
+        
+        Successful responses are memoized on (model, rate, context, prompt),
+        so repeating a request within a session skips the HTTP round trip.
+        Errors are never cached.
         
         Args:
-            schema_text: Compressed schema from SchemaCompressor
+            prompt: Text to compress
+            context: Short description of what the text is
             model: Target LLM model
             rate: Compression rate ('auto', 'high', 'medium', 'low')
             
         Returns:
-            API response with compressed content
+            API response, or a dict with 'error' and success=False on failure
         """
+        key = hashlib.blake2b(
+            f"{model}|{rate}|{context}|{prompt}".encode("utf-8"), digest_size=16
+        ).hexdigest()
+        with self._cache_lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+        
         payload = {
-            "context": "This is a compressed dataset schema for exploratory data analysis",
-            "prompt": schema_text,
+            "context": context,
+            "prompt": prompt,
             "model": model,
             "scaledown": {
                 "rate": rate
             }
         }
         
+        # Compact separators and raw UTF-8 (reports contain emoji) keep the body small
+        body = dumps_json(payload)
+        headers = {}
+        if self.gzip_requests and len(body) >= GZIP_MIN_BYTES:
+            body = gzip.compress(body)
+            headers["Content-Encoding"] = "gzip"
+        
         try:
-            response = requests.post(
-                self.base_url,
-                headers=self.headers,
-                data=json.dumps(payload),
-                timeout=30
+            response = self._session.post(
+                self.base_url, data=body, headers=headers, timeout=30
             )
             response.raise_for_status()
-            return response.json()
+            result = response.json()
         except requests.exceptions.RequestException as e:
             return {
                 "error": str(e),
                 "success": False
             }
+        
+        if "error" not in result:
+            with self._cache_lock:
+                self._cache[key] = result
+                self._cache.move_to_end(key)
+                while len(self._cache) > RESULT_CACHE_SIZE:
+                    self._cache.popitem(last=False)
+        return result
+    
+    def compress_schema(
+        self,
+        schema_text: str,
+        model: str = "gpt-4o",
+        rate: str = "auto"
+    ) -> Dict[str, Any]:
+        """
+        Compress schema text using ScaleDown API.
+        
+        Args:
+            schema_text: Compressed schema from SchemaCompressor
+            model: Target LLM model
+            rate: Compression rate ('auto', 'high', 'medium', 'low')
+            
+        Returns:
+            API response with compressed content
+        """
+        return self._compress(
+            schema_text,
+            "This is a compressed dataset schema for exploratory data analysis",
+            model,
+            rate
+        )
     
     def compress_analysis_context(
         self,
@@ -88,29 +174,12 @@ class ScaleDownIntegration:
         Returns:
             API response with compressed content
         """
-        payload = {
-            "context": "This is analysis history and insights from exploratory data analysis",
-            "prompt": context,
-            "model": model,
-            "scaledown": {
-                "rate": rate
-            }
-        }
-        
-        try:
-            response = requests.post(
-                self.base_url,
-                headers=self.headers,
-                data=json.dumps(payload),
-                timeout=30
-            )
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
-            return {
-                "error": str(e),
-                "success": False
-            }
+        return self._compress(
+            context,
+            "This is analysis history and insights from exploratory data analysis",
+            model,
+            rate
+        )
     
     def compress_full_report(
         self,
@@ -129,29 +198,45 @@ class ScaleDownIntegration:
         Returns:
             API response with compressed content
         """
-        payload = {
-            "context": "This is a comprehensive data analysis report with insights and statistics",
-            "prompt": report,
-            "model": model,
-            "scaledown": {
-                "rate": rate
-            }
-        }
+        return self._compress(
+            report,
+            "This is a comprehensive data analysis report with insights and statistics",
+            model,
+            rate
+        )
+    
+    def compress_bundle(
+        self,
+        schema_text: str,
+        context_text: str,
+        report_text: str,
+        model: str = "gpt-4o",
+        rate: str = "auto"
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Compress schema, history context and report concurrently.
         
-        try:
-            response = requests.post(
-                self.base_url,
-                headers=self.headers,
-                data=json.dumps(payload),
-                timeout=30
-            )
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
-            return {
-                "error": str(e),
-                "success": False
+        The three API calls are independent and network-bound (the GIL is
+        released during socket I/O), so they share the session's keep-alive
+        pool and take roughly as long as the slowest one.
+        
+        Args:
+            schema_text: Compressed schema from SchemaCompressor
+            context_text: Analysis context from HistoryCompressor
+            report_text: Complete analysis report
+            model: Target LLM model
+            rate: Compression rate
+            
+        Returns:
+            Dictionary with 'schema', 'history' and 'report' API responses
+        """
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            futures = {
+                "schema": executor.submit(self.compress_schema, schema_text, model, rate),
+                "history": executor.submit(self.compress_analysis_context, context_text, model, rate),
+                "report": executor.submit(self.compress_full_report, report_text, model, rate),
             }
+            return {name: future.result() for name, future in futures.items()}
     
     def get_compression_stats(
         self,
@@ -6,7 +6,22 @@ Compresses dataset schema to minimize token usage while preserving semantic mean
 import pandas as pd
 import numpy as np
 from typing import Dict, Any, List, Optional
-import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from .kernels import column_stats, top_k_indices
+from .utils import approx_memory_mb, dumps_json
+
+# Frames at least this wide and long compress their columns on a thread pool
+PARALLEL_MIN_COLUMNS = 16
+PARALLEL_MIN_ROWS = 10_000
+MAX_WORKERS = 8
+
+# Typical printed width of one value, by dtype, in the token estimate
+FLOAT_CELL_CHARS = 9
+INT_CELL_CHARS = 5
+BOOL_CELL_CHARS = 5
+DATETIME_CELL_CHARS = 19
 
 
 class SchemaCompressor:
@@ -16,17 +31,21 @@ class SchemaCompressor:
     - Missing value ratios
     - Basic statistics (mean, min, max, std)
     - Cardinality for categorical features
+    - True/false counts for booleans and time ranges for datetimes
     - Sample values for better context
     """
     
-    def __init__(self, max_categorical_samples: int = 5):
+    def __init__(self, max_categorical_samples: int = 5, deep: bool = False):
         """
         Initialize the SchemaCompressor.
         
         Args:
             max_categorical_samples: Maximum number of unique values to show for categorical columns
+            deep: Measure memory usage exactly with a full deep scan of object
+                columns; by default it is extrapolated from a row sample
         """
         self.max_categorical_samples = max_categorical_samples
+        self.deep = deep
     
     def compress(self, df: pd.DataFrame) -> Dict[str, Any]:
         """
@@ -44,84 +63,172 @@ class SchemaCompressor:
                 "columns": len(df.columns)
             },
             "columns": {},
-            "memory_usage_mb": df.memory_usage(deep=True).sum() / (1024 * 1024)
+            "memory_usage_mb": (
+                df.memory_usage(deep=True).sum() / (1024 * 1024) if self.deep
+                else approx_memory_mb(df)
+            )
         }
         
-        for col in df.columns:
-            col_info = self._compress_column(df[col])
-            schema["columns"][col] = col_info
+        # Frame-wide reductions once, instead of several scans per column
+        missing_counts = df.isna().sum(axis=0)
+        numeric_stats = self._get_numeric_stats(df)
+        
+        def compress_column(col):
+            return self._compress_column(df[col], missing_counts[col], numeric_stats)
+        
+        # Factorizing/counting releases the GIL for most dtypes, so wide and
+        # long frames spread the per-column work over threads
+        if len(df.columns) >= PARALLEL_MIN_COLUMNS and len(df) >= PARALLEL_MIN_ROWS:
+            with ThreadPoolExecutor(max_workers=min(MAX_WORKERS, os.cpu_count() or 1)) as executor:
+                col_infos = list(executor.map(compress_column, df.columns))
+        else:
+            col_infos = [compress_column(col) for col in df.columns]
+        schema["columns"] = dict(zip(df.columns, col_infos))
         
         return schema
     
-    def _compress_column(self, series: pd.Series) -> Dict[str, Any]:
+    def _compress_column(
+        self,
+        series: pd.Series,
+        missing_count: int,
+        numeric_stats: Dict[str, Dict[str, Any]]
+    ) -> Dict[str, Any]:
         """
         Compress information for a single column.
         
         Args:
             series: Pandas Series representing a column
+            missing_count: Number of missing values in the column
+            numeric_stats: Per-column numeric entries from `_get_numeric_stats`
             
         Returns:
             Dictionary with compressed column information
         """
         col_info = {
             "dtype": str(series.dtype),
-            "missing_ratio": series.isna().sum() / len(series),
-            "missing_count": int(series.isna().sum()),
+            "missing_ratio": missing_count / len(series),
+            "missing_count": int(missing_count),
         }
         
-        # Determine if column is numeric or categorical
-        if pd.api.types.is_numeric_dtype(series):
-            col_info.update(self._get_numeric_stats(series))
+        # Determine the column kind; booleans and datetimes skip value hashing
+        if series.name in numeric_stats:
+            col_info.update(numeric_stats[series.name])
+        elif pd.api.types.is_bool_dtype(series.dtype):
+            col_info.update(self._get_boolean_stats(series, int(missing_count)))
+        elif pd.api.types.is_datetime64_any_dtype(series.dtype):
+            col_info.update(self._get_datetime_stats(series))
         else:
             col_info.update(self._get_categorical_stats(series))
         
         return col_info
     
-    def _get_numeric_stats(self, series: pd.Series) -> Dict[str, Any]:
-        """Extract statistics for numeric columns."""
-        non_null = series.dropna()
+    def _get_numeric_stats(self, df: pd.DataFrame) -> Dict[str, Dict[str, Any]]:
+        """
+        Extract statistics for every numeric column in one pass.
+        
+        The numeric columns are converted to a single float64 block and
+        summarized by `column_stats` (one sort shared by all quantiles and
+        the distinct-value counts).
+        """
+        columns = [
+            col for col in df.columns
+            if pd.api.types.is_numeric_dtype(df[col]) and not pd.api.types.is_bool_dtype(df[col])
+        ]
+        if not columns:
+            return {}
         
-        if len(non_null) == 0:
-            return {
+        block = df[columns].to_numpy(dtype=np.float64, na_value=np.nan)
+        stats = column_stats(block)
+        # Distinct counts come from the same sort, except for integers too
+        # large to survive the float64 conversion exactly
+        unique_counts = dict(zip(columns, stats["unique"]))
+        inexact = [
+            col for i, col in enumerate(columns)
+            if pd.api.types.is_integer_dtype(df[col])
+            and max(abs(stats["min"][i]), abs(stats["max"][i])) > 2 ** 53
+        ]
+        if inexact:
+            unique_counts.update(df[inexact].nunique(dropna=True))
+        
+        numeric = {}
+        for i, col in enumerate(columns):
+            if stats["count"][i] == 0:
+                numeric[col] = {
+                    "type": "numeric",
+                    "stats": None
+                }
+                continue
+            
+            numeric[col] = {
                 "type": "numeric",
-                "stats": None
+                "stats": {
+                    "mean": float(stats["mean"][i]),
+                    "std": float(stats["std"][i]),
+                    "min": float(stats["min"][i]),
+                    "max": float(stats["max"][i]),
+                    "median": float(stats["median"][i]),
+                    "q25": float(stats["q1"][i]),
+                    "q75": float(stats["q3"][i]),
+                },
+                "unique_count": int(unique_counts[col])
             }
-        
+        return numeric
+    
+    def _get_boolean_stats(self, series: pd.Series, missing_count: int) -> Dict[str, Any]:
+        """Extract statistics for boolean columns (two counts, no hashing)."""
+        true_count = int(series.sum())
+        false_count = len(series) - missing_count - true_count
         return {
-            "type": "numeric",
-            "stats": {
-                "mean": float(non_null.mean()),
-                "std": float(non_null.std()),
-                "min": float(non_null.min()),
-                "max": float(non_null.max()),
-                "median": float(non_null.median()),
-                "q25": float(non_null.quantile(0.25)),
-                "q75": float(non_null.quantile(0.75)),
-            },
-            "unique_count": int(series.nunique())
+            "type": "boolean",
+            "true_count": true_count,
+            "false_count": false_count,
+            "unique_count": int(true_count > 0) + int(false_count > 0)
+        }
+    
+    def _get_datetime_stats(self, series: pd.Series) -> Dict[str, Any]:
+        """Extract the time range and distinct count of datetime columns."""
+        lo, hi = series.min(), series.max()
+        return {
+            "type": "datetime",
+            "min": None if pd.isna(lo) else lo.isoformat(),
+            "max": None if pd.isna(hi) else hi.isoformat(),
+            "unique_count": int(series.nunique(dropna=True))
         }
     
     def _get_categorical_stats(self, series: pd.Series) -> Dict[str, Any]:
-        """Extract statistics for categorical columns."""
-        non_null = series.dropna()
-        unique_count = series.nunique()
+        """
+        Extract statistics for categorical columns.
+        
+        Values are counted as integer codes: `category` columns already carry
+        them, anything else is factorized once (a single hashing pass that
+        also yields the unique count). The most frequent values then come
+        from a top-K selection over the code counts.
+        """
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            codes = series.cat.codes.to_numpy()
+            uniques = series.cat.categories
+            counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+            unique_count = int(np.count_nonzero(counts))
+        else:
+            codes, uniques = pd.factorize(series)
+            counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+            unique_count = len(uniques)
+        top = top_k_indices(counts, self.max_categorical_samples)
         
         stats = {
             "type": "categorical",
-            "unique_count": int(unique_count),
+            "unique_count": unique_count,
             "cardinality": "high" if unique_count > 50 else "medium" if unique_count > 10 else "low"
         }
         
         # Add top values for low/medium cardinality
         if unique_count <= self.max_categorical_samples:
-            value_counts = series.value_counts().head(self.max_categorical_samples)
             stats["top_values"] = {
-                str(k): int(v) for k, v in value_counts.items()
+                str(uniques[i]): int(counts[i]) for i in top
             }
         else:
             # For high cardinality, just show top N
-            value_counts = series.value_counts().head(self.max_categorical_samples)
-            stats["sample_values"] = list(value_counts.index.astype(str))
+            stats["sample_values"] = [str(uniques[i]) for i in top]
         
         return stats
     
@@ -143,27 +250,44 @@ class SchemaCompressor:
             "=== COLUMNS ===",
         ]
         
-        for col_name, col_info in schema["columns"].items():
-            lines.append(f"\n[{col_name}]")
-            lines.append(f"  Type: {col_info['type']} ({col_info['dtype']})")
-            lines.append(f"  Missing: {col_info['missing_ratio']:.1%} ({col_info['missing_count']} values)")
-            
-            if col_info["type"] == "numeric":
-                if col_info["stats"]:
-                    stats = col_info["stats"]
-                    lines.append(f"  Range: [{stats['min']:.2f}, {stats['max']:.2f}]")
-                    lines.append(f"  Mean ± Std: {stats['mean']:.2f} ± {stats['std']:.2f}")
-                    lines.append(f"  Median: {stats['median']:.2f}")
-                    lines.append(f"  Unique: {col_info['unique_count']}")
-            else:
-                lines.append(f"  Cardinality: {col_info['cardinality']} ({col_info['unique_count']} unique)")
-                if "top_values" in col_info:
-                    lines.append(f"  Values: {', '.join(col_info['top_values'].keys())}")
-                elif "sample_values" in col_info:
-                    lines.append(f"  Sample: {', '.join(col_info['sample_values'][:3])}...")
-        
+        lines.extend(
+            self._column_text(col_name, col_info)
+            for col_name, col_info in schema["columns"].items()
+        )
         return "\n".join(lines)
     
+    def _column_text(self, col_name: Any, col_info: Dict[str, Any]) -> str:
+        """Format one column's block of `to_text` as a single multi-line string."""
+        text = (
+            f"\n[{col_name}]\n"
+            f"  Type: {col_info['type']} ({col_info['dtype']})\n"
+            f"  Missing: {col_info['missing_ratio']:.1%} ({col_info['missing_count']} values)"
+        )
+        
+        if col_info["type"] == "numeric":
+            stats = col_info["stats"]
+            if stats:
+                text += (
+                    f"\n  Range: [{stats['min']:.2f}, {stats['max']:.2f}]"
+                    f"\n  Mean ± Std: {stats['mean']:.2f} ± {stats['std']:.2f}"
+                    f"\n  Median: {stats['median']:.2f}"
+                    f"\n  Unique: {col_info['unique_count']}"
+                )
+        elif col_info["type"] == "boolean":
+            text += f"\n  Values: True {col_info['true_count']}, False {col_info['false_count']}"
+        elif col_info["type"] == "datetime":
+            if col_info["min"] is not None:
+                text += f"\n  Range: [{col_info['min']}, {col_info['max']}]"
+            text += f"\n  Unique: {col_info['unique_count']}"
+        else:
+            text += f"\n  Cardinality: {col_info['cardinality']} ({col_info['unique_count']} unique)"
+            if "top_values" in col_info:
+                text += f"\n  Values: {', '.join(col_info['top_values'].keys())}"
+            elif "sample_values" in col_info:
+                text += f"\n  Sample: {', '.join(col_info['sample_values'][:3])}..."
+        
+        return text
+    
     def to_json(self, schema: Dict[str, Any], pretty: bool = True) -> str:
         """
         Convert schema to JSON string.
@@ -175,28 +299,32 @@ class SchemaCompressor:
         Returns:
             JSON string
         """
-        if pretty:
-            return json.dumps(schema, indent=2)
-        return json.dumps(schema)
+        return dumps_json(schema, indent=pretty).decode("utf-8")
     
-    def estimate_token_reduction(self, df: pd.DataFrame) -> Dict[str, int]:
+    def estimate_token_reduction(
+        self,
+        df: pd.DataFrame,
+        schema: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, int]:
         """
         Estimate token reduction compared to sending full dataset.
         
         Args:
             df: Input DataFrame
+            schema: Previously compressed schema of `df` (None = compress now)
             
         Returns:
             Dictionary with token estimates
         """
         # Rough estimation: 1 token ≈ 4 characters
-        schema = self.compress(df)
+        if schema is None:
+            schema = self.compress(df)
         schema_text = self.to_text(schema)
         schema_tokens = len(schema_text) // 4
         
         # Estimate full dataset size (first 100 rows as sample)
-        sample_text = df.head(100).to_string()
-        full_dataset_tokens = (len(sample_text) * len(df)) // (100 * 4)
+        sample_chars = _estimate_text_length(df.head(100))
+        full_dataset_tokens = (sample_chars * len(df)) // (100 * 4)
         
         return {
             "schema_tokens": schema_tokens,
@@ -204,3 +332,35 @@ class SchemaCompressor:
             "reduction_ratio": full_dataset_tokens / schema_tokens if schema_tokens > 0 else 0,
             "tokens_saved": full_dataset_tokens - schema_tokens
         }
+
+
+def _estimate_text_length(df: pd.DataFrame) -> int:
+    """
+    Approximate ``len(df.to_string())`` from typical per-dtype value widths.
+    
+    Numbers, booleans and datetimes count a fixed width per value; other
+    columns use the mean string length of their values. Each column is at
+    least as wide as its header, plus a two-space separator. No cell is
+    formatted, so the estimate is rough but cheap.
+    """
+    n_rows = len(df)
+    line = len(str(max(n_rows - 1, 0)))
+    
+    for col in df.columns:
+        dtype = df[col].dtype
+        if pd.api.types.is_bool_dtype(dtype):
+            width = BOOL_CELL_CHARS
+        elif pd.api.types.is_integer_dtype(dtype):
+            width = INT_CELL_CHARS
+        elif pd.api.types.is_numeric_dtype(dtype):
+            width = FLOAT_CELL_CHARS
+        elif pd.api.types.is_datetime64_any_dtype(dtype):
+            width = DATETIME_CELL_CHARS
+        else:
+            width = df[col].astype(str).str.len().mean() if n_rows else np.nan
+            # Missing values print as "NaN"/"None"; all-missing columns have no lengths
+            width = 3 if pd.isna(width) else int(round(width))
+        line += 2 + max(len(str(col)), width)
+    
+    # Header plus one line per row, joined by newlines
+    return (n_rows + 1) * line + n_rows
@@ -2,31 +2,222 @@
 Utility functions for the Data Analysis Agent.
 """
 
+import importlib.util
+import json
+import os
+import warnings
+from functools import lru_cache
 import pandas as pd
 import numpy as np
-from typing import Optional
+from pathlib import Path
+from typing import Any, Dict, List, Optional
 
+from .kernels import correlation
 
-def load_sample_data(dataset_name: str = "iris") -> pd.DataFrame:
+# orjson (optional) is a much faster JSON serializer
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Files above this size are treated as "large" (roughly >100k rows)
+LARGE_CSV_BYTES = 20 * 1024 * 1024
+CSV_CHUNK_ROWS = 200_000
+
+# On-disk cache of generated sample datasets. Bump the version whenever a
+# sample generator changes so stale snapshots are not reused.
+SAMPLE_CACHE_DIR = Path.home() / ".cache" / "data-analysis-agent"
+SAMPLE_CACHE_VERSION = 4
+
+
+def fast_read_csv(path_or_buf, row_limit: Optional[int] = None) -> pd.DataFrame:
+    """
+    Read a CSV file using the fastest available parser.
+
+    Tries pyarrow's multithreaded CSV reader directly first, then pandas'
+    pyarrow engine, and falls back to the C engine if pyarrow is unavailable
+    or cannot parse the file. Columns are
+    Arrow-backed whenever pyarrow is installed, so previews (e.g.
+    ``st.dataframe``) can hand the buffers over without a conversion copy.
+    Large files read with a row limit are parsed in chunks so reading stops
+    as soon as enough rows have been collected.
+
+    Args:
+        path_or_buf: File path or file-like object (e.g. a Streamlit upload)
+        row_limit: Maximum number of rows to return (None = all rows)
+
+    Returns:
+        Loaded DataFrame
+    """
+    if row_limit is not None and _source_size(path_or_buf) > LARGE_CSV_BYTES:
+        return _read_csv_chunked(path_or_buf, row_limit)
+
+    try:
+        df = _read_csv_arrow(path_or_buf)
+    except (ImportError, ValueError):
+        _rewind(path_or_buf)
+        try:
+            df = pd.read_csv(
+                path_or_buf,
+                engine="pyarrow",
+                dtype_backend="pyarrow",
+                cache_dates=True
+            )
+            df.columns = _mangle_header([str(col) for col in df.columns])
+        except (ImportError, ValueError):
+            _rewind(path_or_buf)
+            df = pd.read_csv(
+                path_or_buf,
+                engine="c",
+                low_memory=False,
+                cache_dates=True,
+                **_arrow_backend()
+            )
+
+    if row_limit is not None:
+        df = df.head(row_limit)
+    return df
+
+
+def _read_csv_arrow(path_or_buf) -> pd.DataFrame:
+    """Parse a CSV with pyarrow.csv in parallel 1 MB blocks into ArrowDtype columns."""
+    import pyarrow.csv as pv
+
+    table = pv.read_csv(
+        path_or_buf,
+        read_options=pv.ReadOptions(block_size=1 << 20, use_threads=True),
+        # Treat empty/"NA"-style strings as missing, like pandas does
+        convert_options=pv.ConvertOptions(strings_can_be_null=True)
+    )
+    names = table.column_names
+    if len(set(names)) < len(names) or "" in names:
+        table = table.rename_columns(_mangle_header(names))
+    return table.to_pandas(types_mapper=pd.ArrowDtype)
+
+
+def _mangle_header(names: List[str]) -> List[str]:
+    """
+    Rename blank and duplicate CSV headers the way pandas' C parser does.
+
+    Blank names become ``Unnamed: <position>``; repeats of a name get
+    ``.1``, ``.2``, ... suffixes, skipping suffixes already used in the
+    header. The Arrow readers keep such headers verbatim, and duplicate
+    labels break column lookups downstream.
+    """
+    header = [name if name != "" else f"Unnamed: {i}" for i, name in enumerate(names)]
+    counts: Dict[str, int] = {}
+    for i, name in enumerate(header):
+        col = name
+        cur_count = counts.get(col, 0)
+        while cur_count > 0:
+            counts[name] = cur_count + 1
+            col = f"{name}.{cur_count}"
+            cur_count = cur_count + 1 if col in header else counts.get(col, 0)
+        header[i] = col
+        counts[col] = cur_count + 1
+    return header
+
+
+def _read_csv_chunked(path_or_buf, row_limit: int) -> pd.DataFrame:
+    """Read a large CSV in chunks, stopping once `row_limit` rows are read."""
+    chunks = []
+    n_rows = 0
+    reader = pd.read_csv(
+        path_or_buf,
+        engine="c",
+        low_memory=False,
+        cache_dates=True,
+        chunksize=CSV_CHUNK_ROWS,
+        **_arrow_backend()
+    )
+    with reader:
+        for chunk in reader:
+            chunks.append(chunk)
+            n_rows += len(chunk)
+            if n_rows >= row_limit:
+                break
+
+    if not chunks:
+        return pd.DataFrame()
+    return pd.concat(chunks, ignore_index=True).head(row_limit)
+
+
+def _arrow_backend() -> Dict[str, str]:
+    """read_csv keyword selecting Arrow-backed dtypes, if pyarrow is installed."""
+    if importlib.util.find_spec("pyarrow") is None:
+        return {}
+    return {"dtype_backend": "pyarrow"}
+
+
+def _source_size(path_or_buf) -> int:
+    """Best-effort size in bytes of a CSV path or file-like object."""
+    if isinstance(path_or_buf, (str, os.PathLike)):
+        try:
+            return os.path.getsize(path_or_buf)
+        except OSError:
+            return 0
+    size = getattr(path_or_buf, "size", None)
+    if isinstance(size, int):
+        return size
+    try:
+        pos = path_or_buf.tell()
+        path_or_buf.seek(0, os.SEEK_END)
+        size = path_or_buf.tell()
+        path_or_buf.seek(pos)
+        return size
+    except (AttributeError, OSError):
+        return 0
+
+
+def _rewind(path_or_buf):
+    """Seek a file-like object back to the start so it can be re-read."""
+    if hasattr(path_or_buf, "seek"):
+        path_or_buf.seek(0)
+
+
+def load_sample_data(dataset_name: str = "iris", use_cache: bool = True) -> pd.DataFrame:
     """
     Load a sample dataset for testing and demonstration.
     
+    Datasets are snapshotted as zstd-compressed parquet files in
+    SAMPLE_CACHE_DIR on first use and read back from there afterwards.
+    Within a process the loaded frames are also kept in memory, and each
+    call returns its own copy so callers may modify it freely.
+    
     Args:
         dataset_name: Name of the dataset ('iris', 'titanic', 'tips', 'random')
+        use_cache: Whether to use the in-memory and on-disk parquet caches
         
     Returns:
         Sample DataFrame
     """
-    if dataset_name == "iris":
-        return load_iris_data()
-    elif dataset_name == "titanic":
-        return load_titanic_sample()
-    elif dataset_name == "tips":
-        return load_tips_sample()
-    elif dataset_name == "random":
-        return generate_random_data()
-    else:
+    if dataset_name not in _SAMPLE_LOADERS:
         raise ValueError(f"Unknown dataset: {dataset_name}")
+    
+    if not use_cache:
+        return _SAMPLE_LOADERS[dataset_name]()
+    return _load_cached_sample(dataset_name).copy()
+
+
+@lru_cache(maxsize=8)
+def _load_cached_sample(dataset_name: str) -> pd.DataFrame:
+    """Load a sample dataset through the parquet snapshot (memoized; do not mutate)."""
+    cache_path = SAMPLE_CACHE_DIR / f"{dataset_name}-v{SAMPLE_CACHE_VERSION}.parquet"
+    if cache_path.exists():
+        try:
+            return pd.read_parquet(cache_path, engine="pyarrow")
+        except (ImportError, OSError, ValueError):
+            pass  # Unreadable snapshot: regenerate below
+    
+    df = _SAMPLE_LOADERS[dataset_name]()
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = cache_path.with_suffix(f".{os.getpid()}.tmp")
+        df.to_parquet(tmp_path, engine="pyarrow", compression="zstd")
+        os.replace(tmp_path, cache_path)
+    except (ImportError, OSError, ValueError):
+        pass  # Caching is best-effort (no pyarrow, read-only home, ...)
+    return df
 
 
 def load_iris_data() -> pd.DataFrame:
@@ -41,52 +232,50 @@ def load_iris_data() -> pd.DataFrame:
 
 def load_titanic_sample() -> pd.DataFrame:
     """Create a sample Titanic-like dataset."""
-    np.random.seed(42)
+    rng = np.random.default_rng(42)
     n = 200
     
-    df = pd.DataFrame({
-        'PassengerId': range(1, n + 1),
-        'Survived': np.random.choice([0, 1], n, p=[0.62, 0.38]),
-        'Pclass': np.random.choice([1, 2, 3], n, p=[0.24, 0.21, 0.55]),
-        'Name': [f"Passenger {i}" for i in range(1, n + 1)],
-        'Sex': np.random.choice(['male', 'female'], n, p=[0.65, 0.35]),
-        'Age': np.random.normal(30, 14, n).clip(0.5, 80),
-        'SibSp': np.random.poisson(0.5, n),
-        'Parch': np.random.poisson(0.4, n),
-        'Fare': np.random.lognormal(3, 1, n),
-        'Embarked': np.random.choice(['C', 'Q', 'S'], n, p=[0.19, 0.09, 0.72])
-    })
-    
-    # Introduce some missing values
-    missing_mask = np.random.random(n) < 0.2
-    df.loc[missing_mask, 'Age'] = np.nan
+    age = rng.normal(30, 14, n).clip(0.5, 80)
+    embarked = rng.choice(np.array(['C', 'Q', 'S'], dtype=object), n, p=[0.19, 0.09, 0.72])
     
-    missing_mask = np.random.random(n) < 0.05
-    df.loc[missing_mask, 'Embarked'] = np.nan
+    # Introduce some missing values (before the frame is built, so no reindexing)
+    age[rng.random(n) < 0.2] = np.nan
+    embarked[rng.random(n) < 0.05] = np.nan
     
-    return df
+    data = {
+        'PassengerId': np.arange(1, n + 1),
+        'Survived': rng.choice([0, 1], n, p=[0.62, 0.38]),
+        'Pclass': rng.choice([1, 2, 3], n, p=[0.24, 0.21, 0.55]),
+        'Name': [f"Passenger {i}" for i in range(1, n + 1)],
+        'Sex': rng.choice(['male', 'female'], n, p=[0.65, 0.35]),
+        'Age': age,
+        'SibSp': rng.poisson(0.5, n),
+        'Parch': rng.poisson(0.4, n),
+        'Fare': rng.lognormal(3, 1, n),
+        'Embarked': embarked
+    }
+    return pd.DataFrame(data, copy=False)
 
 
 def load_tips_sample() -> pd.DataFrame:
     """Create a sample tips dataset."""
-    np.random.seed(42)
+    rng = np.random.default_rng(42)
     n = 150
     
-    df = pd.DataFrame({
-        'total_bill': np.random.uniform(10, 50, n),
-        'tip': np.random.uniform(1, 10, n),
-        'sex': np.random.choice(['Male', 'Female'], n),
-        'smoker': np.random.choice(['Yes', 'No'], n, p=[0.3, 0.7]),
-        'day': np.random.choice(['Thur', 'Fri', 'Sat', 'Sun'], n),
-        'time': np.random.choice(['Lunch', 'Dinner'], n, p=[0.35, 0.65]),
-        'size': np.random.choice([1, 2, 3, 4, 5, 6], n, p=[0.05, 0.35, 0.25, 0.20, 0.10, 0.05])
-    })
-    
+    total_bill = rng.uniform(10, 50, n)
     # Make tip correlate somewhat with total_bill
-    df['tip'] = df['total_bill'] * 0.15 + np.random.normal(0, 1, n)
-    df['tip'] = df['tip'].clip(1, None)
+    tip = (total_bill * 0.15 + rng.normal(0, 1, n)).clip(1, None)
     
-    return df
+    data = {
+        'total_bill': total_bill,
+        'tip': tip,
+        'sex': rng.choice(['Male', 'Female'], n),
+        'smoker': rng.choice(['Yes', 'No'], n, p=[0.3, 0.7]),
+        'day': rng.choice(['Thur', 'Fri', 'Sat', 'Sun'], n),
+        'time': rng.choice(['Lunch', 'Dinner'], n, p=[0.35, 0.65]),
+        'size': rng.choice([1, 2, 3, 4, 5, 6], n, p=[0.05, 0.35, 0.25, 0.20, 0.10, 0.05])
+    }
+    return pd.DataFrame(data, copy=False)
 
 
 def generate_random_data(
@@ -107,38 +296,209 @@ def generate_random_data(
     Returns:
         Random DataFrame
     """
-    np.random.seed(42)
+    rng = np.random.default_rng(42)
     data = {}
     
-    # Generate numeric columns
+    # Draw the normal-based and the uniform columns as one block each, then
+    # shape each column in place (column-major so every column is contiguous)
+    block = np.empty((n_rows, n_numeric), order="F")
+    uniform = np.arange(n_numeric) % 3 == 2
+    block[:, ~uniform] = rng.standard_normal((n_rows, int((~uniform).sum())))
+    block[:, uniform] = rng.uniform(0, 100, (n_rows, int(uniform.sum())))
     for i in range(n_numeric):
+        col = block[:, i]
         if i % 3 == 0:
             # Normal distribution
-            data[f'numeric_{i}'] = np.random.normal(100, 20, n_rows)
+            col *= 20
+            col += 100
         elif i % 3 == 1:
             # Skewed distribution
-            data[f'numeric_{i}'] = np.random.lognormal(3, 1, n_rows)
-        else:
-            # Uniform distribution
-            data[f'numeric_{i}'] = np.random.uniform(0, 100, n_rows)
+            col += 3
+            np.exp(col, out=col)
+        # else: uniform distribution, already drawn
+        data[f'numeric_{i}'] = col
     
-    # Generate categorical columns
+    # Generate categorical columns: every column's codes come from one draw,
+    # scaled to that column's number of categories
+    n_categories = rng.integers(3, 10, n_categorical)
+    codes = (rng.random((n_categorical, n_rows)) * n_categories[:, None]).astype(np.intp)
+    labels = np.array([f'cat_{j}' for j in range(n_categories.max(initial=0))], dtype=object)
     for i in range(n_categorical):
-        n_categories = np.random.randint(3, 10)
-        categories = [f'cat_{j}' for j in range(n_categories)]
-        data[f'categorical_{i}'] = np.random.choice(categories, n_rows)
-    
-    df = pd.DataFrame(data)
+        data[f'categorical_{i}'] = labels[codes[i]]
     
     # Introduce missing values
     if missing_ratio > 0:
-        for col in df.columns:
-            missing_mask = np.random.random(n_rows) < missing_ratio
-            df.loc[missing_mask, col] = np.nan
+        missing = rng.random((len(data), n_rows)) < missing_ratio
+        for mask, values in zip(missing, data.values()):
+            values[mask] = np.nan
     
+    return pd.DataFrame(data, copy=False)
+
+
+_SAMPLE_LOADERS = {
+    "iris": load_iris_data,
+    "titanic": load_titanic_sample,
+    "tips": load_tips_sample,
+    "random": generate_random_data,
+}
+
+
+def approx_memory_mb(df: pd.DataFrame, sample_rows: int = 1000) -> float:
+    """
+    Approximate DataFrame memory usage without a full deep scan.
+
+    ``df.memory_usage(deep=True)`` inspects every Python object in object
+    columns. Here only the first `sample_rows` of each object column are
+    measured and the per-row size is extrapolated to the full column.
+
+    Args:
+        df: Input DataFrame
+        sample_rows: Number of rows sampled per object column
+
+    Returns:
+        Estimated memory usage in MB
+    """
+    total = df.memory_usage(deep=False).sum()
+    n_rows = len(df)
+    if n_rows == 0:
+        return total / (1024 * 1024)
+
+    for col in df.columns:
+        series = df[col]
+        if not pd.api.types.is_object_dtype(series.dtype):
+            continue
+        sample = series.iloc[:sample_rows]
+        shallow = sample.memory_usage(deep=False, index=False)
+        deep = sample.memory_usage(deep=True, index=False)
+        total += (deep - shallow) / len(sample) * n_rows
+
+    return total / (1024 * 1024)
+
+
+def missing_counts(df: pd.DataFrame) -> pd.Series:
+    """
+    Count missing values per column without a frame-sized boolean mask.
+
+    Equivalent to ``df.isnull().sum()``, but each column is reduced on its
+    own, so peak extra memory is one column's mask rather than a boolean
+    copy of the whole frame. NumPy float columns take an ``np.isnan`` fast
+    path.
+
+    Args:
+        df: Input DataFrame
+
+    Returns:
+        Missing value count per column
+    """
+    counts = []
+    for _, series in df.items():
+        if isinstance(series.dtype, np.dtype) and series.dtype.kind == "f":
+            counts.append(np.count_nonzero(np.isnan(series.to_numpy())))
+        else:
+            counts.append(int(series.isna().sum()))
+    return pd.Series(counts, index=df.columns, dtype=np.int64)
+
+
+def downcast_numeric(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Shrink numpy-backed numeric columns to the smallest dtype that holds them.
+
+    Integers are downcast with ``pd.to_numeric(downcast="integer")``. Floats
+    become float32 only when every value round-trips exactly, so reported
+    statistics are unchanged. Arrow-backed columns are already compact and
+    are left alone.
+
+    Args:
+        df: DataFrame to downcast (modified in place)
+
+    Returns:
+        The same DataFrame
+    """
+    for col in df.select_dtypes("integer").columns:
+        if not isinstance(df[col].dtype, pd.ArrowDtype):
+            df[col] = pd.to_numeric(df[col], downcast="integer")
+
+    for col in df.select_dtypes("floating").columns:
+        series = df[col]
+        if isinstance(series.dtype, pd.ArrowDtype) or series.dtype == np.float32:
+            continue
+        small = pd.to_numeric(series, downcast="float")
+        if small.astype(series.dtype).equals(series):
+            df[col] = small
     return df
 
 
+def correlation_matrix(
+    df: pd.DataFrame,
+    columns: Optional[List[str]] = None,
+    dtype=np.float64
+) -> pd.DataFrame:
+    """
+    Compute the Pearson correlation matrix with a few BLAS matrix products.
+
+    Gives the same result as ``df[columns].corr()`` (pairwise-complete
+    observations), but replaces pandas' per-pair loop with matrix products
+    on a contiguous array of the requested floating point type.
+
+    Args:
+        df: Input DataFrame
+        columns: Numeric columns to correlate (None = all numeric)
+        dtype: Floating point type used for the computation
+
+    Returns:
+        Correlation matrix as a DataFrame labelled by column
+    """
+    if columns is None:
+        columns = df.select_dtypes(include=[np.number]).columns.tolist()
+
+    arr = df[columns].to_numpy(dtype=dtype, na_value=np.nan)
+    return pd.DataFrame(correlation(arr), index=columns, columns=columns)
+
+
+def dumps_json(obj: Any, indent: bool = False) -> bytes:
+    """
+    Serialize `obj` to UTF-8 JSON, with orjson when it is installed.
+
+    Both backends produce the same document: compact separators (or a
+    two-space indent), raw UTF-8, non-string keys such as integer column
+    labels as strings, NumPy values as plain numbers and NaN/inf as null.
+    Only the spelling of float exponents may differ (``1e-07`` vs ``1e-7``).
+
+    Args:
+        obj: JSON-compatible object (NumPy scalars and arrays allowed)
+        indent: Pretty-print with a two-space indent
+
+    Returns:
+        Encoded JSON document
+    """
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, option=option)
+    return json.dumps(
+        _json_safe(obj),
+        indent=2 if indent else None,
+        separators=(",", ": ") if indent else (",", ":"),
+        ensure_ascii=False
+    ).encode("utf-8")
+
+
+def _json_safe(obj: Any) -> Any:
+    """Convert NumPy values and non-finite floats the way orjson writes them."""
+    if isinstance(obj, dict):
+        return {key: _json_safe(value) for key, value in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_json_safe(value) for value in obj]
+    if isinstance(obj, np.ndarray):
+        return _json_safe(obj.tolist())
+    if isinstance(obj, np.generic):
+        obj = obj.item()
+    if isinstance(obj, float) and not np.isfinite(obj):
+        return None
+    return obj
+
+
 def format_bytes(bytes_size: int) -> str:
     """
     Format bytes into human-readable string.
@@ -1,16 +1,29 @@
 """
 Visualization utilities for the Data Analysis Agent.
+
+matplotlib and seaborn are imported inside the plotting functions, so
+importing this module (or the agent) doesn't pay their start-up cost.
 """
 
-import matplotlib.pyplot as plt
-import seaborn as sns
 import pandas as pd
 import numpy as np
 from typing import List, Optional, Tuple
 
+from .utils import correlation_matrix, missing_counts
+
+# Scatter plots above this many points draw a sample of the inliers
+MAX_SCATTER_POINTS = 20_000
+
+# KDE curves are fitted on at most this many points, evaluated on this grid
+MAX_KDE_POINTS = 50_000
+KDE_GRID_POINTS = 200
+
 
 def setup_plot_style():
     """Set up consistent plotting style."""
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    
     sns.set_style("whitegrid")
     plt.rcParams['figure.figsize'] = (12, 6)
     plt.rcParams['font.size'] = 10
@@ -24,7 +37,9 @@ def plot_missing_values(df: pd.DataFrame, figsize: Tuple[int, int] = (10, 6)):
         df: Input DataFrame
         figsize: Figure size tuple
     """
-    missing_data = df.isnull().sum()
+    import matplotlib.pyplot as plt
+    
+    missing_data = missing_counts(df)
     missing_data = missing_data[missing_data > 0].sort_values(ascending=False)
     
     if len(missing_data) == 0:
@@ -65,6 +80,8 @@ def plot_numeric_distributions(
         columns: Specific columns to plot (None = all numeric)
         ncols: Number of columns in the subplot grid
     """
+    import matplotlib.pyplot as plt
+    
     if columns is None:
         columns = df.select_dtypes(include=[np.number]).columns.tolist()
     
@@ -78,19 +95,16 @@ def plot_numeric_distributions(
     
     for idx, col in enumerate(columns):
         ax = axes[idx]
-        data = df[col].dropna()
+        data = df[col].dropna().to_numpy(dtype=np.float64)
         
         # Histogram with KDE
         ax.hist(data, bins=30, alpha=0.7, color='skyblue', edgecolor='black')
-        ax.set_title(f'{col}\n(μ={data.mean():.2f}, σ={data.std():.2f})')
+        ax.set_title(f'{col}\n(μ={data.mean():.2f}, σ={data.std(ddof=1):.2f})')
         ax.set_xlabel('Value')
         ax.set_ylabel('Frequency')
         
         # Add KDE line
-        try:
-            data.plot(kind='density', ax=ax, secondary_y=True, color='red', alpha=0.5)
-        except:
-            pass
+        _plot_kde(ax, data)
     
     # Hide empty subplots
     for idx in range(len(columns), len(axes)):
@@ -100,6 +114,30 @@ def plot_numeric_distributions(
     plt.show()
 
 
+def _plot_kde(ax, data: np.ndarray):
+    """
+    Draw a Gaussian KDE of `data` on a secondary y axis of `ax`.
+    
+    The density is fitted on a sample of at most MAX_KDE_POINTS values, as
+    the fit costs O(points x grid), and is skipped when scipy is missing or
+    the data is degenerate (e.g. constant).
+    """
+    try:
+        from scipy.stats import gaussian_kde
+    except ImportError:
+        return
+    
+    if len(data) > MAX_KDE_POINTS:
+        data = data[np.random.default_rng(0).choice(len(data), MAX_KDE_POINTS, replace=False)]
+    try:
+        kde = gaussian_kde(data)
+    except (ValueError, np.linalg.LinAlgError):
+        return
+    
+    xs = np.linspace(data.min(), data.max(), KDE_GRID_POINTS)
+    ax.twinx().plot(xs, kde(xs), color='red', alpha=0.5)
+
+
 def plot_correlation_matrix(
     df: pd.DataFrame,
     columns: Optional[List[str]] = None,
@@ -115,6 +153,9 @@ def plot_correlation_matrix(
         figsize: Figure size
         annot: Whether to annotate cells with values
     """
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    
     if columns is None:
         columns = df.select_dtypes(include=[np.number]).columns.tolist()
     
@@ -122,7 +163,8 @@ def plot_correlation_matrix(
         print("Need at least 2 numeric columns for correlation!")
         return
     
-    corr_matrix = df[columns].corr()
+    # The heatmap shows 2 decimals, so float32 precision is plenty
+    corr_matrix = correlation_matrix(df, columns, dtype=np.float32)
     
     plt.figure(figsize=figsize)
     sns.heatmap(
@@ -153,6 +195,8 @@ def plot_categorical_distributions(
         columns: Specific columns (None = all categorical)
         ncols: Number of columns in subplot grid
     """
+    import matplotlib.pyplot as plt
+    
     if columns is None:
         columns = df.select_dtypes(include=['object', 'category']).columns.tolist()
     
@@ -195,7 +239,10 @@ def plot_outlier_detection(
         column: Column name
         method: Detection method ('iqr' or 'zscore')
     """
-    data = df[column].dropna()
+    import matplotlib.pyplot as plt
+    
+    # Plain float array: matplotlib and the masks below skip pandas wrapping
+    data = df[column].dropna().to_numpy(dtype=np.float64)
     
     fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(12, 5))
     
@@ -207,18 +254,26 @@ def plot_outlier_detection(
     
     # Scatter plot with outliers highlighted
     if method == 'iqr':
-        q1 = data.quantile(0.25)
-        q3 = data.quantile(0.75)
+        # No values (e.g. an all-NaN column): NaN bounds, like pandas' quantile()
+        q1, q3 = np.quantile(data, [0.25, 0.75]) if len(data) else (np.nan, np.nan)
         iqr = q3 - q1
         lower_bound = q1 - 1.5 * iqr
         upper_bound = q3 + 1.5 * iqr
         outliers = (data < lower_bound) | (data > upper_bound)
     else:  # zscore
-        z_scores = np.abs((data - data.mean()) / data.std())
-        outliers = z_scores > 3
+        mu = data.mean()
+        sd = data.std(ddof=1)
+        outliers = np.abs((data - mu) / sd) > 3
+    
+    # Every outlier is drawn; inliers are sampled uniformly on large columns
+    positions = np.arange(len(data))
+    if len(data) > MAX_SCATTER_POINTS:
+        keep = outliers.copy()
+        keep[np.random.default_rng(0).choice(len(data), MAX_SCATTER_POINTS, replace=False)] = True
+        positions = positions[keep]
     
-    colors = ['red' if outlier else 'blue' for outlier in outliers]
-    ax2.scatter(range(len(data)), data, c=colors, alpha=0.6)
+    colors = np.where(outliers[positions], 'red', 'blue')
+    ax2.scatter(positions, data[positions], c=colors, alpha=0.6)
     ax2.set_title(f'Outliers in {column} ({method.upper()} method)')
     ax2.set_xlabel('Index')
     ax2.set_ylabel('Value')